@@ -17,9 +17,8 @@ import shutil
 from datetime import datetime
 from modules.scraper import get_channel_videos
 from modules.downloader import VideoDownloader
-from modules.splitter import VideoSplitter
-from modules.editor import VideoEditor
-from modules.youtube_uploader import YouTubeUploader
+from modules.splitter import VideoSplitter, clear_probe_cache, open_segment_stream, split_video
+from modules.editor import VideoEditor, get_video_info
 from modules.notifier import notify_cookies_needed, notify_all_videos_complete, notify_video_uploaded, notify_error
 
 # Setup logging
@@ -65,6 +64,8 @@ class YouTubeShortsAutomation:
     def uploader(self):
         """Lazy initialize uploader to avoid authentication on every run"""
         if self._uploader is None:
+            # Imported here so runs that never upload don't load the uploader
+            from modules.youtube_uploader import YouTubeUploader
             credentials_file = self.config['youtube_upload']['credentials_file']
             self._uploader = YouTubeUploader(credentials_file)
         return self._uploader
@@ -266,18 +267,15 @@ class YouTubeShortsAutomation:
         parts_already_uploaded = video_data.get('parts_uploaded', [])
         next_part_to_upload = max(parts_already_uploaded) + 1 if parts_already_uploaded else 1
         
-        from modules.splitter import get_video_duration
-        try:
-             total_duration = get_video_duration(video_path)
-             # Calculate total parts
-             total_possible_parts = int(total_duration / self.segment_duration)
-             if total_duration % self.segment_duration >= 10:
-                 total_possible_parts += 1
-             
-             total_parts = min(total_possible_parts, self.max_segments_per_video)
-        except Exception as e:
-             logger.error(f"❌ Error calculating duration: {e}")
-             total_parts = self.max_segments_per_video # Fallback
+        # Same (start_time, duration) plan the splitter cuts by
+        segment_info = self.splitter.get_segment_info(video_path, self.segment_duration)
+        if not segment_info:
+            # Don't treat an unreadable video as finished (that would delete it)
+            logger.error("❌ Error calculating duration, skipping this run")
+            return
+        total_duration = segment_info['total_duration']
+        segment_plan = segment_info['segments']
+        total_parts = min(len(segment_plan), self.max_segments_per_video)
         
         logger.info(f"\n📊 Video Analysis:")
         logger.info(f"   Total duration: {total_duration:.2f}s")
@@ -292,6 +290,7 @@ class YouTubeShortsAutomation:
             # Delete local
             if os.path.exists(video_path):
                 os.remove(video_path)
+            clear_probe_cache(video_path)
             
             # Delete from cloud (HuggingFace) to free space - OPTIONAL since user has 100GB
             # User said "jabtam sare video part part me upload kerna khatam na hojaye"
@@ -322,29 +321,63 @@ class YouTubeShortsAutomation:
         processed_dir = self.config['paths']['processed']
         segments_to_upload = []
         
+        source_info = get_video_info(video_path)
+        
+        # Several new parts: cut + edit them all in one FFmpeg run (one decode)
+        fused_results = {}
+        new_parts = [
+            part_num for part_num in parts_to_process
+            if not os.path.exists(os.path.join(processed_dir, f"{video_id}_part{part_num}.mp4"))
+        ]
+        if len(new_parts) > 1:
+            fused_segments = []
+            for part_num in new_parts:
+                start_time, duration = segment_plan[part_num - 1]
+                fused_segments.append((part_num, start_time, start_time + duration))
+            output_tpl = os.path.join(processed_dir, f"{video_id}_part{{n}}_edited.mp4")
+            results = self.editor.split_and_edit(video_path, fused_segments, output_tpl, source_info)
+            fused_results = dict(zip(new_parts, results))
+        
         for part_num in parts_to_process:
-            start_time = (part_num - 1) * self.segment_duration
-            end_time = min(start_time + self.segment_duration, total_duration)
+            start_time, duration = segment_plan[part_num - 1]
+            end_time = start_time + duration
             
             segment_filename = f"{video_id}_part{part_num}.mp4"
             segment_path = os.path.join(processed_dir, segment_filename)
             edited_filename = f"{video_id}_part{part_num}_edited.mp4"
             edited_path = os.path.join(processed_dir, edited_filename)
             
-            # Create/Split
-            if not os.path.exists(segment_path):
-                logger.info(f"Creating part {part_num}...")
-                from modules.splitter import split_video
-                result_path = split_video(video_path, start_time, end_time, processed_dir, segment_filename)
-                if not result_path:
-                    logger.error(f"Failed to split part {part_num}")
-                    continue
+            edited_result = fused_results.get(part_num)
+            if not edited_result and not os.path.exists(segment_path):
+                logger.info(f"Creating + editing part {part_num}...")
+                stream = open_segment_stream(video_path, start_time, end_time)
+                if stream:
+                    # Pipe the copied cut straight into the editor (no intermediate mp4)
+                    process, segment_duration = stream
+                    edited_result = self.editor.add_overlays_from_stream(
+                        process, dict(source_info, duration=segment_duration),
+                        part_num, video_data['title'], edited_path
+                    )
+                else:
+                    # Can't copy the cut: edit straight from the source (one encode)
+                    edited_result = self.editor.add_overlays_from_range(
+                        video_path, start_time, end_time, source_info,
+                        part_num, video_data['title'], edited_path
+                    )
+                
+                if not edited_result:
+                    # Fall back to split-to-file, then edit
+                    logger.warning(f"Direct edit failed, splitting part {part_num} to file...")
+                    if not split_video(video_path, start_time, end_time, processed_dir, segment_filename):
+                        logger.error(f"Failed to split part {part_num}")
+                        continue
             
-            # Edit
-            logger.info(f"Editing part {part_num}...")
-            edited_result = self.editor.add_overlays(
-                segment_path, part_num, video_data['title'], edited_path
-            )
+            if not edited_result:
+                # Edit
+                logger.info(f"Editing part {part_num}...")
+                edited_result = self.editor.add_overlays(
+                    segment_path, part_num, video_data['title'], edited_path
+                )
             
             if edited_result:
                 segments_to_upload.append((edited_path, part_num, video_data['title']))
@@ -475,6 +508,7 @@ class YouTubeShortsAutomation:
             
             if os.path.exists(video_path):
                 os.remove(video_path)
+            clear_probe_cache(video_path)
             
             if cloud_url:
                 logger.info(f"🗑️ Deleting from cloud storage...")
@@ -3,6 +3,7 @@ Video Editor
 Adds text overlays (part numbers) and converts to YouTube Shorts format (9:16)
 Uses FFmpeg for reliable video processing with blur background for landscape videos
 """
+import asyncio
 import subprocess
 import os
 import logging
@@ -48,14 +49,58 @@ def get_video_info(video_path: str) -> dict:
         return {'width': 1920, 'height': 1080, 'duration': 60}
 
 
+def _has_audio(video_path: str) -> bool:
+    """Check whether the file has at least one audio stream"""
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'a',
+        '-show_entries', 'stream=index',
+        '-of', 'csv=p=0',
+        video_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return bool(result.stdout.strip())
+
+
+async def _probe_durations_async(video_paths: list, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def probe(video_path):
+        try:
+            async with semaphore:
+                process = await asyncio.create_subprocess_exec(
+                    'ffprobe', '-v', 'error',
+                    '-show_entries', 'format=duration',
+                    '-of', 'default=noprint_wrappers=1:nokey=1',
+                    video_path,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                stdout, _ = await process.communicate()
+            return float(stdout.decode().strip())
+        except (OSError, ValueError):
+            return 0.0
+    
+    return await asyncio.gather(*(probe(video_path) for video_path in video_paths))
+
+
+def probe_durations(video_paths: list, concurrency: int = 8) -> dict:
+    """Get {path: duration} for many files, running up to `concurrency` ffprobes at once (0.0 if unreadable)"""
+    if not video_paths:
+        return {}
+    durations = asyncio.run(_probe_durations_async(video_paths, concurrency))
+    return dict(zip(video_paths, durations))
+
+
 class VideoEditor:
     def __init__(self, config: dict):
         self.config = config
         self.overlay_settings = config.get('overlay_settings', {})
         self.video_settings = config.get('video_settings', {})
         self.reaction_dir = os.path.join(os.getcwd(), 'assets', 'reactions')
+        self._reaction_durations = {}  # clip path -> duration, probed once per editor
 
-    def _create_reaction_track(self, target_duration: float) -> str:
+    def _create_reaction_track(self, target_duration: float, output_path: str = 'temp_reaction_track.mp4') -> str:
         """
         Create a reaction video track by concatenating random clips
         from assets/reactions to match target_duration.
@@ -70,6 +115,12 @@ class VideoEditor:
             if f.lower().endswith(('.mp4', '.mov', '.webm'))
         ]
         
+        # Check real durations for accuracy: probe all new clips at once
+        # instead of one ffprobe per pick
+        unprobed = [clip for clip in clips if clip not in self._reaction_durations]
+        self._reaction_durations.update(probe_durations(unprobed))
+        clips = [clip for clip in clips if self._reaction_durations[clip] > 0]
+        
         if not clips:
             return None
             
@@ -81,21 +132,16 @@ class VideoEditor:
         while current_duration < target_duration + 5:
             clip = random.choice(clips)
             selected_clips.append(clip)
-            # Estimate clip duration (assume ~7s as user said, or check real)
-            # Check real duration for accuracy
-            info = get_video_info(clip)
-            current_duration += info['duration']
+            current_duration += self._reaction_durations[clip]
             
         # Create concat list file
-        concat_list_path = 'temp_concat_list.txt'
+        concat_list_path = f"{os.path.splitext(output_path)[0]}_concat_list.txt"
         with open(concat_list_path, 'w', encoding='utf-8') as f:
             for clip in selected_clips:
                 # Escape paths for FFmpeg
                 formatted_path = clip.replace('\\', '/').replace("'", "'\\''")
                 f.write(f"file '{formatted_path}'\n")
         
-        output_path = 'temp_reaction_track.mp4'
-        
         try:
             # Concatenate
             cmd = [
@@ -122,7 +168,7 @@ class VideoEditor:
             return None
 
     
-    def _create_text_overlay(self, text: str, width: int, height: int = 200) -> str:
+    def _create_text_overlay(self, text: str, width: int, height: int = 200, overlay_path: str = 'temp_overlay.png') -> str:
         """Create a text overlay image using PIL"""
         # Create transparent image
         img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
@@ -170,7 +216,6 @@ class VideoEditor:
         draw.text((x, y), text, font=font, fill=(255, 255, 255, 255))
         
         # Save to temp file
-        overlay_path = 'temp_overlay.png'
         img.save(overlay_path)
         
         return overlay_path
@@ -183,18 +228,172 @@ class VideoEditor:
             base, ext = os.path.splitext(video_path)
             output_path = f"{base}_edited{ext}"
         
-        reaction_track = None
+        logger.info(f"Adding overlays to: {video_path}")
+        
+        # Verify input exists
+        if not os.path.exists(video_path):
+            logger.error(f"Input file not found: {video_path}")
+            return None
+        
+        return self._render(['-i', video_path], get_video_info(video_path), part_number, output_path)
+    
+    def add_overlays_from_range(self, video_path: str, start_time: float, end_time: float, video_info: dict,
+                                part_number: int, title: str, output_path: str) -> str:
+        """
+        Same as add_overlays, but edits start_time..end_time of the full source
+        video directly (exact seek, one decode + encode, no cut file or pipe).
+        video_info is get_video_info() of the source.
+        """
+        logger.info(f"Adding overlays to {video_path} [{start_time:.2f}s-{end_time:.2f}s] (part {part_number})")
+        
+        duration = end_time - start_time
+        input_args = ['-ss', str(start_time), '-t', str(duration), '-i', video_path]
+        return self._render(input_args, dict(video_info, duration=duration), part_number, output_path)
+    
+    def add_overlays_from_stream(self, stream: subprocess.Popen, video_info: dict, part_number: int,
+                                 title: str, output_path: str) -> str:
+        """
+        Same as add_overlays, but reads the segment as MPEG-TS from another
+        FFmpeg process's stdout (see splitter.open_segment_stream) instead of
+        from an mp4 on disk. video_info must describe the streamed segment.
+        """
+        logger.info(f"Adding overlays to streamed segment (part {part_number})")
+        
+        try:
+            result = self._render(['-f', 'mpegts', '-i', 'pipe:0'], video_info, part_number, output_path,
+                                  stdin=stream.stdout)
+        finally:
+            stream.stdout.close()
+            _, stream_err = stream.communicate()
+        
+        if stream.returncode != 0:
+            logger.error(f"Segment stream error: {stream_err.decode(errors='replace')}")
+            return None
+        return result
+    
+    def split_and_edit(self, video_path: str, segments: list, output_tpl: str, video_info: dict = None) -> list:
+        """
+        Cut AND edit several parts of one source video with a single FFmpeg run:
+        the source is decoded once, split in the filter graph, trimmed per part
+        and run through the usual overlay chain, writing one Short per part.
+        
+        Args:
+            video_path: Full source video
+            segments: List of (part_number, start_time, end_time) tuples
+            output_tpl: Output path with {n} for the part number
+            video_info: get_video_info() of the source (probed if not given)
+        
+        Returns:
+            One output path per segment (None where that part failed)
+        """
+        if not segments:
+            return []
+        
+        temp_files = []
+        output_paths = [output_tpl.format(n=part_number) for part_number, _, _ in segments]
         
         try:
-            logger.info(f"Adding overlays to: {video_path}")
+            if video_info is None:
+                video_info = get_video_info(video_path)
+            has_audio = _has_audio(video_path)
+            target_width, target_height = self.video_settings.get('target_resolution', [1080, 1920])
+            n = len(segments)
             
-            # Verify input exists
-            if not os.path.exists(video_path):
-                logger.error(f"Input file not found: {video_path}")
-                return None
+            # Fast-seek to the first part; trims below are relative to it
+            first_start = min(start for _, start, _ in segments)
+            cmd = ['ffmpeg', '-y', '-ss', str(first_start), '-i', video_path]
+            
+            filters = [
+                "[0:v]split=" + str(n) + "".join(f"[src_v{i}]" for i in range(n))
+            ]
+            if has_audio:
+                filters.append("[0:a]asplit=" + str(n) + "".join(f"[src_a{i}]" for i in range(n)))
+            
+            input_index = 1
+            for i, (part_number, start_time, end_time) in enumerate(segments):
+                start = start_time - first_start
+                end = end_time - first_start
+                
+                part_text = self.overlay_settings.get('part_text_format', 'Part {n}').format(n=part_number)
+                overlay_path = self._create_text_overlay(
+                    part_text, target_width, overlay_path=f"temp_overlay_{part_number}.png"
+                )
+                temp_files.append(overlay_path)
+                cmd.extend(['-i', overlay_path])
+                text_in = f"{input_index}:v"
+                input_index += 1
+                
+                reaction_track = self._create_reaction_track(
+                    end_time - start_time, output_path=f"temp_reaction_track_{part_number}.mp4"
+                )
+                reaction_in = None
+                if reaction_track:
+                    temp_files.append(reaction_track)
+                    cmd.extend(['-i', reaction_track])
+                    reaction_in = f"{input_index}:v"
+                    input_index += 1
+                
+                filters.append(f"[src_v{i}]trim=start={start}:end={end},setpts=PTS-STARTPTS[part_v{i}]")
+                filters.append(self._build_filter_with_blur_background(
+                    video_info['width'], video_info['height'],
+                    target_width, target_height,
+                    reaction_in is not None,
+                    video_in=f"part_v{i}", text_in=text_in, reaction_in=reaction_in,
+                    out=f"outv{i}"
+                ))
+                if has_audio:
+                    filters.append(f"[src_a{i}]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[outa{i}]")
+            
+            cmd.extend(['-filter_complex', ';'.join(filters)])
+            
+            for i, output_path in enumerate(output_paths):
+                cmd.extend(['-map', f"[outv{i}]"])
+                if has_audio:
+                    cmd.extend(['-map', f"[outa{i}]"])
+                cmd.extend([
+                    '-c:v', 'libx264',
+                    '-preset', 'slow',
+                    '-crf', '23',
+                    '-c:a', 'aac',
+                    '-b:a', '256k',
+                    '-r', '30',
+                    '-movflags', '+faststart',
+                    output_path
+                ])
+            cmd.extend(['-loglevel', 'error'])
+            
+            logger.info(f"Cutting + editing {n} parts in one FFmpeg run...")
+            result = subprocess.run(cmd, capture_output=True, text=True)
             
-            # Get video info
-            video_info = get_video_info(video_path)
+            if result.returncode != 0:
+                logger.error(f"FFmpeg error: {result.stderr}")
+                # Outputs may be truncated (or stale from an earlier run): don't hand them on
+                for path in output_paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+                return [None] * len(segments)
+            
+            return [
+                path if os.path.exists(path) and os.path.getsize(path) > 1000 else None
+                for path in output_paths
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error in split_and_edit: {e}")
+            import traceback
+            traceback.print_exc()
+            return [None] * len(segments)
+        
+        finally:
+            for temp_file in temp_files:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+    
+    def _render(self, input_args: list, video_info: dict, part_number: int, output_path: str, stdin=None) -> str:
+        """Run the overlay/9:16 FFmpeg job for one input (file or pipe)"""
+        reaction_track = None
+        
+        try:
             input_width = video_info['width']
             input_height = video_info['height']
             duration = video_info['duration']
@@ -224,7 +423,7 @@ class VideoEditor:
             # FFmpeg command
             cmd = [
                 'ffmpeg', '-y',
-                '-i', video_path,  # [0:v] Input video
+                *input_args,  # [0:v] Input video
                 '-i', overlay_path       # [1:v] Text Overlay
             ]
             
@@ -247,7 +446,7 @@ class VideoEditor:
             ])
             
             logger.info(f"Writing edited video to: {output_path}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, stdin=stdin, capture_output=True, text=True)
             
             # Cleanup
             if os.path.exists(overlay_path):
@@ -279,10 +478,14 @@ class VideoEditor:
             traceback.print_exc()
             return None
     
-    def _build_filter_with_blur_background(self, in_w: int, in_h: int, out_w: int, out_h: int, has_reaction: bool = False) -> str:
+    def _build_filter_with_blur_background(self, in_w: int, in_h: int, out_w: int, out_h: int, has_reaction: bool = False,
+                                           video_in: str = '0:v', text_in: str = '1:v', reaction_in: str = '2:v',
+                                           out: str = 'outv') -> str:
         """
         Build FFmpeg filter complex for 9:16 conversion with BLUR BACKGROUND
         Optional: Adds Reaction Video at Bottom Left
+        Input/output pad labels can be overridden so several of these chains
+        can live in one filter graph (intermediate labels are suffixed with `out`).
         """
         target_aspect = out_w / out_h
         current_aspect = in_w / in_h
@@ -291,17 +494,17 @@ class VideoEditor:
         if current_aspect > target_aspect:
             # LANDSCAPE video - needs blur background padding
             main_filter = (
-                "[0:v]split=2[bg_in][fg_in];"
-                f"[bg_in]scale={out_w}:{out_h}:force_original_aspect_ratio=increase,crop={out_w}:{out_h},gblur=sigma=18,eq=brightness=-0.3:saturation=0.5[bg];"
-                f"[fg_in]scale={out_w}:-2[fg_scaled];"
-                "[bg][fg_scaled]overlay=(W-w)/2:(H-h)/2[main_out]"
+                f"[{video_in}]split=2[bg_in_{out}][fg_in_{out}];"
+                f"[bg_in_{out}]scale={out_w}:{out_h}:force_original_aspect_ratio=increase,crop={out_w}:{out_h},gblur=sigma=18,eq=brightness=-0.3:saturation=0.5[bg_{out}];"
+                f"[fg_in_{out}]scale={out_w}:-2[fg_scaled_{out}];"
+                f"[bg_{out}][fg_scaled_{out}]overlay=(W-w)/2:(H-h)/2[main_out_{out}]"
             )
         else:
             # PORTRAIT/SQUARE
             if current_aspect < target_aspect:
-                main_filter = f"[0:v]scale={out_w}:-2,crop={out_w}:{out_h}[main_out]"
+                main_filter = f"[{video_in}]scale={out_w}:-2,crop={out_w}:{out_h}[main_out_{out}]"
             else:
-                main_filter = f"[0:v]scale={out_w}:{out_h}[main_out]"
+                main_filter = f"[{video_in}]scale={out_w}:{out_h}[main_out_{out}]"
         
         # 2. Add Reaction (if present)
         if has_reaction:
@@ -311,18 +514,18 @@ class VideoEditor:
             
             # Process Reaction: [2:v] -> Crop Square -> Scale
             reaction_filter = (
-                f";[2:v]crop='min(iw,ih)':'min(iw,ih)',scale={react_w}:{react_w}[react_out];"
-                f"[main_out][react_out]overlay={padding}:H-h-{padding}[video_with_react]"
+                f";[{reaction_in}]crop='min(iw,ih)':'min(iw,ih)',scale={react_w}:{react_w}[react_out_{out}];"
+                f"[main_out_{out}][react_out_{out}]overlay={padding}:H-h-{padding}[video_with_react_{out}]"
             )
-            final_overlay_input = "[video_with_react]"
+            final_overlay_input = f"[video_with_react_{out}]"
         else:
             reaction_filter = ""
-            final_overlay_input = "[main_out]"
+            final_overlay_input = f"[main_out_{out}]"
             
         # 3. Add Text Overlay
         final_filter = (
             f"{main_filter}{reaction_filter};"
-            f"{final_overlay_input}[1:v]overlay=(W-w)/2:0[outv]"
+            f"{final_overlay_input}[{text_in}]overlay=(W-w)/2:0[{out}]"
         )
         
         return final_filter
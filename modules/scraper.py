@@ -3,8 +3,6 @@ YouTube Channel Scraper - HINDI VERSION
 Scrapes all videos from a YouTube channel without using API
 Filters videos to only include those after March 15, 2019 (Hindi audio available)
 """
-import requests
-from bs4 import BeautifulSoup
 import json
 import re
 from typing import List, Dict
@@ -17,6 +15,23 @@ logger = logging.getLogger(__name__)
 # Minimum date for Hindi audio availability on MrBeast channel
 MIN_VIDEO_DATE = datetime(2019, 3, 15)
 
+_RELATIVE_DATE_RE = re.compile(r'(\d+)\s*(second|minute|hour|day|week|month|year)s?\s*ago')
+
+# Seconds per unit (month/year are approximate)
+_UNIT_SECS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+    'week': 604800,
+    'month': 2592000,  # 30 days
+    'year': 31536000,  # 365 days
+}
+
+# "1.2M views" -> ('1.2', 'm'), "1,234 views" -> ('1,234', '')
+_VIEW_COUNT_RE = re.compile(r'([\d.,]+)\s*([kmb]?)')
+_VIEW_SUFFIX_MULTIPLIERS = {'k': 1000, 'm': 1000000, 'b': 1000000000}
+
 
 def parse_relative_date(relative_str: str) -> datetime:
     """
@@ -27,32 +42,14 @@ def parse_relative_date(relative_str: str) -> datetime:
     relative_str = relative_str.lower().strip()
     
     # Extract number and unit
-    match = re.search(r'(\d+)\s*(second|minute|hour|day|week|month|year)s?\s*ago', relative_str)
+    match = _RELATIVE_DATE_RE.search(relative_str)
     
     if not match:
         # If can't parse, assume it's recent (within date range)
         return now
     
     number = int(match.group(1))
-    unit = match.group(2)
-    
-    # Calculate the date
-    if unit == 'second':
-        return now - timedelta(seconds=number)
-    elif unit == 'minute':
-        return now - timedelta(minutes=number)
-    elif unit == 'hour':
-        return now - timedelta(hours=number)
-    elif unit == 'day':
-        return now - timedelta(days=number)
-    elif unit == 'week':
-        return now - timedelta(weeks=number)
-    elif unit == 'month':
-        return now - timedelta(days=number * 30)  # Approximate
-    elif unit == 'year':
-        return now - timedelta(days=number * 365)  # Approximate
-    
-    return now
+    return now - timedelta(seconds=number * _UNIT_SECS[match.group(2)])
 
 
 def is_video_after_min_date(published_str: str, min_date: datetime = MIN_VIDEO_DATE) -> bool:
@@ -64,6 +61,25 @@ def is_video_after_min_date(published_str: str, min_date: datetime = MIN_VIDEO_D
 
 
 
+def _entry_to_video(entry: Dict) -> Dict:
+    """Convert a yt-dlp flat-playlist entry into our video dict"""
+    pub_date = "Unknown"
+    # yt-dlp often gives upload_date in YYYYMMDD format
+    d = entry.get('upload_date')
+    if d and len(d) == 8 and d.isdigit():
+        pub_date = f"{d[:4]}-{d[4:6]}-{d[6:8]}"
+    
+    video_id = entry.get('id')
+    return {
+        'id': video_id,
+        'title': entry.get('title'),
+        'views': entry.get('view_count', 0) or 0,
+        'duration': entry.get('duration', 0), # in seconds
+        'published': pub_date,
+        'url': entry.get('url') or f"https://www.youtube.com/watch?v={video_id}"
+    }
+
+
 def get_channel_videos(channel_url: str, sort_by: str = 'date', filter_by_date: bool = True) -> List[Dict]:
     """
     Scrape all videos from a YouTube channel using yt-dlp for reliability.
@@ -74,7 +90,6 @@ def get_channel_videos(channel_url: str, sort_by: str = 'date', filter_by_date:
     if not channel_url.endswith('/videos'):
         channel_url = channel_url.rstrip('/') + '/videos'
     
-    videos = []
     import subprocess
     import shutil
     
@@ -107,25 +122,7 @@ def get_channel_videos(channel_url: str, sort_by: str = 'date', filter_by_date:
         
         logger.info(f"Found {len(entries)} videos (limited to latest 50)")
         
-        for entry in entries:
-            pub_date = "Unknown"
-            # yt-dlp often gives upload_date in YYYYMMDD format
-            if entry.get('upload_date'):
-                d = entry.get('upload_date')
-                try:
-                    dt = datetime.strptime(d, '%Y%m%d')
-                    pub_date = dt.strftime('%Y-%m-%d')
-                except:
-                    pass
-            
-            videos.append({
-                'id': entry.get('id'),
-                'title': entry.get('title'),
-                'views': entry.get('view_count', 0) or 0,
-                'duration': entry.get('duration', 0), # in seconds
-                'published': pub_date,
-                'url': entry.get('url') or f"https://www.youtube.com/watch?v={entry.get('id')}"
-            })
+        videos = [_entry_to_video(entry) for entry in entries]
 
         # Filter by date (Hindi audio availability)
         if filter_by_date:
@@ -167,19 +164,13 @@ def parse_view_count(view_text: str) -> int:
     Parse view count text like "1.2M views" to integer
     """
     try:
-        # Remove "views" and clean
-        view_text = view_text.lower().replace('views', '').replace('view', '').strip()
+        match = _VIEW_COUNT_RE.search(view_text.lower())
+        if not match:
+            return 0
         
         # Handle K, M, B suffixes
-        multipliers = {'k': 1000, 'm': 1000000, 'b': 1000000000}
-        
-        for suffix, multiplier in multipliers.items():
-            if suffix in view_text:
-                number = float(view_text.replace(suffix, '').strip())
-                return int(number * multiplier)
-        
-        # No suffix, just a number
-        return int(view_text.replace(',', ''))
+        number = float(match.group(1).replace(',', ''))
+        return int(number * _VIEW_SUFFIX_MULTIPLIERS.get(match.group(2), 1))
         
     except:
         return 0
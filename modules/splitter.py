@@ -3,142 +3,625 @@ Video Splitter
 Splits videos into 1-minute segments using FFmpeg subprocess for reliability
 """
 import os
+import re
+import json
 import subprocess
 import logging
-from typing import List
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# H.264 encoders in order of preference (hardware first, libx264 last)
+_H264_ENCODER_CANDIDATES = ['h264_nvenc', 'h264_qsv', 'h264_videotoolbox', 'h264_amf']
+_H264_ENCODER = None
 
+# Override FFmpeg threads per invocation (1-64); default splits CPUs across parallel runs
+FFMPEG_THREADS_ENV = 'KUTTA_FFMPEG_THREADS'
 
+# Only the end of a failed run's stderr is kept for the log
+_STDERR_TAIL_BYTES = 4096
 
-def get_video_duration(video_path: str) -> float:
-    """Get video duration using ffprobe"""
+# Sources in these codecs can be cut into mp4 parts by copying packets
+_COPY_VIDEO_CODECS = ('h264',)
+_COPY_AUDIO_CODECS = ('aac', 'mp3')
+
+# VideoSplitter parts are written as fragmented mp4 (moov up front, no
+# second pass to relocate it); compat mode uses classic +faststart instead
+_FRAGMENTED_MOVFLAGS = '+frag_keyframe+empty_moov+default_base_moof'
+_COMPAT_MOVFLAGS = '+faststart'
+
+# ffprobe results are cached next to the video as {video_path}.probe.json
+PROBE_CACHE_SUFFIX = '.probe.json'
+
+# Duration/stream info comes from the container header, so don't let ffprobe
+# read (and decode) more of the file than it needs to find it. Some files
+# need more than this; callers retry without these limits.
+_QUICK_PROBE_ARGS = [
+    '-probesize', '5M',
+    '-analyzeduration', '5M',
+    '-read_intervals', '%+#1',
+    '-threads', '0',
+]
+
+
+def _detect_h264_encoder() -> str:
+    """
+    Find the first hardware H.264 encoder that ffmpeg lists AND can actually open.
+    An encoder being compiled in doesn't mean the GPU/driver is present, so
+    each candidate is confirmed with a tiny test encode.
+    """
     try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            capture_output=True, text=True
+        )
+        listed = result.stdout
+    except Exception as e:
+        logger.warning(f"Could not list FFmpeg encoders: {e}")
+        return 'libx264'
+    
+    for encoder in _H264_ENCODER_CANDIDATES:
+        if f" {encoder} " not in listed:
+            continue
+        test_cmd = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', 'color=black:size=256x256:duration=0.1',
+            '-c:v', encoder, '-f', 'null', '-'
+        ]
+        try:
+            if _run_ffmpeg(test_cmd, timeout=30)[0] == 0:
+                return encoder
+        except Exception:
+            continue
+    
+    return 'libx264'
+
+
+def _run_ffmpeg(cmd: List[str], timeout: Optional[float] = None) -> Tuple[int, str]:
+    """
+    Run an FFmpeg command with stdout discarded and stderr drained by
+    communicate() (so a chatty run can't block on a full pipe).
+    Returns (returncode, stderr); stderr is only decoded, and capped to its
+    last few KB, when the run failed or timed out.
+    """
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return -1, f"timed out after {timeout:.0f}s"
+    
+    if process.returncode == 0:
+        return 0, ''
+    return process.returncode, stderr[-_STDERR_TAIL_BYTES:].decode(errors='replace')
+
+
+def _ffmpeg_timeout(duration: float) -> float:
+    """Generous wall-clock limit for processing duration seconds of video"""
+    return max(60, duration * 4)
+
+
+def get_h264_encoder() -> str:
+    """Get the H.264 encoder to use (detected once per process)"""
+    global _H264_ENCODER
+    if _H264_ENCODER is None:
+        _H264_ENCODER = _detect_h264_encoder()
+        logger.info(f"Using H.264 encoder: {_H264_ENCODER}")
+    return _H264_ENCODER
+
+
+def _video_codec_args(encoder: str) -> List[str]:
+    """FFmpeg video codec arguments for the given encoder"""
+    if encoder == 'h264_nvenc':
+        return [
+            '-c:v', encoder,
+            '-preset', 'p4', '-tune', 'hq',
+            '-rc', 'vbr', '-b:v', '8M', '-maxrate', '10M',
+            '-spatial_aq', '1'
+        ]
+    if encoder == 'h264_qsv':
+        return ['-c:v', encoder, '-preset', 'veryfast']
+    if encoder in ('h264_videotoolbox', 'h264_amf'):
+        return ['-c:v', encoder]
+    return ['-c:v', 'libx264', '-preset', 'slow']  # Good quality encoding
+
+
+def _probe_duration(video_path: str) -> float:
+    """Get video duration straight from ffprobe (no caching)"""
+    for limits in (_QUICK_PROBE_ARGS, []):
         cmd = [
             'ffprobe', '-v', 'error',
+            *limits,
             '-show_entries', 'format=duration',
             '-of', 'default=noprint_wrappers=1:nokey=1',
             video_path
         ]
+        # The answer is one short line, so stderr is discarded rather than captured
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            stdout, _ = process.communicate(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        output = stdout.decode(errors='replace').strip()
+        if output and output != 'N/A':
+            break
+    return float(output)
+
+
+def _probe_streams(video_path: str) -> dict:
+    """Get duration, fps and stream codecs with a single ffprobe run"""
+    for limits in (_QUICK_PROBE_ARGS, []):
+        cmd = [
+            'ffprobe', '-v', 'error',
+            *limits,
+            '-show_format', '-show_streams',
+            '-of', 'json',
+            video_path
+        ]
         result = subprocess.run(cmd, capture_output=True, text=True)
-        return float(result.stdout.strip())
+        data = json.loads(result.stdout or '{}')
+        if data.get('format', {}).get('duration') not in (None, 'N/A'):
+            break
+    
+    streams = [
+        {
+            'codec_type': stream.get('codec_type'),
+            'codec_name': stream.get('codec_name'),
+            'width': stream.get('width'),
+            'height': stream.get('height'),
+        }
+        for stream in data.get('streams', [])
+    ]
+    
+    fps = 0.0
+    for stream in data.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            num, _, den = stream.get('avg_frame_rate', '0/1').partition('/')
+            if den and float(den):
+                fps = float(num) / float(den)
+            break
+    
+    return {
+        'duration': float(data['format']['duration']),
+        'fps': fps,
+        'streams': streams,
+    }
+
+
+def _probe_keyframes(video_path: str) -> List[float]:
+    """Get sorted video keyframe timestamps (seconds) using ffprobe"""
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        video_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframes.append(float(pts_time))
+    keyframes.sort()
+    return keyframes
+
+
+def _probe_cache(video_path: str, keyframes: bool = False) -> dict:
+    """
+    ffprobe metadata for a video: {'duration', 'fps', 'streams', 'keyframes'}.
+    Results are kept in a {video_path}.probe.json sidecar and reused while the
+    video's mtime and size are unchanged. The keyframe index is only probed
+    when asked for, since it means reading every packet.
+    """
+    stat = os.stat(video_path)
+    sidecar_path = video_path + PROBE_CACHE_SUFFIX
+    
+    info = None
+    try:
+        with open(sidecar_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('mtime') == stat.st_mtime and cached.get('size') == stat.st_size:
+            info = cached
+    except (OSError, ValueError):
+        pass
+    
+    changed = False
+    if info is None:
+        info = {'mtime': stat.st_mtime, 'size': stat.st_size, 'keyframes': None}
+        info.update(_probe_streams(video_path))
+        changed = True
+    
+    if keyframes and info.get('keyframes') is None:
+        info['keyframes'] = _probe_keyframes(video_path)
+        changed = True
+    
+    if changed:
+        try:
+            with open(sidecar_path, 'w', encoding='utf-8') as f:
+                json.dump(info, f)
+        except OSError as e:
+            logger.warning(f"Could not write probe cache: {e}")
+    
+    return info
+
+
+def clear_probe_cache(video_path: str):
+    """Delete the probe sidecar for a video (call when deleting the video)"""
+    sidecar_path = video_path + PROBE_CACHE_SUFFIX
+    if os.path.exists(sidecar_path):
+        os.remove(sidecar_path)
+
+
+def _source_codecs(video_path: str) -> Tuple[Optional[str], Optional[str]]:
+    """(video codec, audio codec) of the first streams, from the probe cache"""
+    video_codec = audio_codec = None
+    for stream in _probe_cache(video_path)['streams']:
+        if stream['codec_type'] == 'video' and video_codec is None:
+            video_codec = stream['codec_name']
+        elif stream['codec_type'] == 'audio' and audio_codec is None:
+            audio_codec = stream['codec_name']
+    return video_codec, audio_codec
+
+
+def is_copy_compatible(video_path: str) -> bool:
+    """True if the source is already H.264 (+ AAC/MP3 or no audio), so parts can be stream-copied"""
+    try:
+        video_codec, audio_codec = _source_codecs(video_path)
+    except Exception as e:
+        logger.warning(f"Could not read source codecs: {e}")
+        return False
+    return video_codec in _COPY_VIDEO_CODECS and audio_codec in (None, *_COPY_AUDIO_CODECS)
+
+
+def _ffmpeg_threads(pool_size: int, threads_per_invocation: Optional[int] = None) -> int:
+    """
+    Threads for each of pool_size concurrent FFmpeg runs: the explicit value,
+    else $KUTTA_FFMPEG_THREADS, else the CPUs divided evenly between the runs
+    (so parallel encodes don't oversubscribe the machine).
+    """
+    if threads_per_invocation is None:
+        env_value = os.environ.get(FFMPEG_THREADS_ENV)
+        if env_value:
+            try:
+                threads_per_invocation = int(env_value)
+            except ValueError:
+                threads_per_invocation = 0  # Rejected below
+            if not 1 <= threads_per_invocation <= 64:
+                logger.warning(f"Ignoring {FFMPEG_THREADS_ENV}={env_value!r} (must be 1-64)")
+                threads_per_invocation = None
+    elif not 1 <= threads_per_invocation <= 64:
+        raise ValueError(f"threads_per_invocation must be 1-64, got {threads_per_invocation}")
+    
+    if threads_per_invocation is None:
+        threads_per_invocation = max(1, (os.cpu_count() or 1) // pool_size)
+    return threads_per_invocation
+
+
+def _decode_args(encoder: str) -> List[str]:
+    """Input options for decoding: use hardware decode alongside a hardware encoder"""
+    if encoder == 'libx264':
+        return []
+    return ['-hwaccel', 'auto']
+
+
+def get_video_duration(video_path: str) -> float:
+    """Get video duration using ffprobe (cached per file)"""
+    try:
+        return _probe_cache(video_path)['duration']
     except Exception as e:
         logger.error(f"Error getting duration: {e}")
         return 0
 
 
-def split_video(video_path: str, start_time: float, end_time: float, output_dir: str, output_filename: str) -> str:
+def get_keyframes(video_path: str) -> List[float]:
+    """Get sorted video keyframe timestamps (seconds), cached per file"""
+    try:
+        return _probe_cache(video_path, keyframes=True)['keyframes']
+    except Exception as e:
+        logger.error(f"Error getting keyframes: {e}")
+        return []
+
+
+def _plan_segments(total_duration: float, segment_duration: int) -> List[Tuple[int, float]]:
+    """
+    (start_time, duration) of each part. Starts are whole multiples of
+    segment_duration (no float drift); a final partial part is only
+    included if it's at least 10 seconds long.
+    """
+    n_full = int(total_duration) // segment_duration
+    plan = [(i * segment_duration, segment_duration) for i in range(n_full)]
+    remainder = total_duration - n_full * segment_duration
+    if remainder >= 10:
+        plan.append((n_full * segment_duration, remainder))
+    return plan
+
+
+def _snap_to_keyframe(keyframes: List[float], start_time: float) -> float:
+    """Nearest keyframe at or before start_time (start_time itself if none)"""
+    i = bisect_right(keyframes, start_time) - 1
+    return keyframes[i] if i >= 0 else start_time
+
+
+def _remove_partial(output_path: str):
+    """Delete what a failed (or killed) FFmpeg run left behind, so it isn't mistaken for a part"""
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+
+def _copy_segment(video_path: str, start_time: float, end_time: float, output_path: str) -> Optional[str]:
+    """Cut one segment by copying packets (start_time should be a keyframe)"""
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', str(start_time),
+        '-i', video_path,
+        '-t', str(end_time - start_time),
+        '-c', 'copy',
+        '-avoid_negative_ts', 'make_zero',
+        '-movflags', '+faststart',
+        '-loglevel', 'error',
+        output_path
+    ]
+    
+    returncode, stderr = _run_ffmpeg(cmd, timeout=_ffmpeg_timeout(end_time - start_time))
+    if returncode != 0:
+        logger.error(f"FFmpeg error (copy): {stderr}")
+        _remove_partial(output_path)
+        return None
+    
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 1000:
+        return output_path
+    return None
+
+
+def open_segment_stream(video_path: str, start_time: float,
+                        end_time: float) -> Optional[Tuple[subprocess.Popen, float]]:
+    """
+    Start FFmpeg copying one segment's packets to its stdout as MPEG-TS, so
+    the editor can read it directly (VideoEditor.add_overlays_from_stream)
+    without an intermediate mp4 on disk. The start is snapped back to the
+    previous keyframe.
+    Returns (process, segment_duration), or None if the segment can't be
+    copied (source isn't H.264 + AAC/MP3, or no keyframe within 2s): then
+    re-encoding here would just be a second encode, so the caller should
+    edit straight from the file instead (VideoEditor.add_overlays_from_range).
+    """
+    keyframes = get_keyframes(video_path) if is_copy_compatible(video_path) else []
+    snapped = _snap_to_keyframe(keyframes, start_time)
+    if not keyframes or start_time - snapped > 2:
+        return None
+    
+    start_time = snapped
+    duration = end_time - start_time
+    cmd = [
+        'ffmpeg',
+        '-ss', str(start_time),
+        '-i', video_path,
+        '-t', str(duration),
+        '-c', 'copy',
+        '-avoid_negative_ts', 'make_zero',
+        '-f', 'mpegts',
+        '-loglevel', 'error',
+        'pipe:1'
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return process, duration
+
+
+def split_video(video_path: str, start_time: float, end_time: float, output_dir: str, output_filename: str,
+                copy_mode: bool = True) -> str:
     """
     Split a specific segment from video using FFmpeg.
+    copy_mode: cut by copying packets (lossless, no encode) when the source is
+    H.264 + AAC/MP3. The start is snapped back to the previous keyframe; if
+    that would move it by more than 2s, or the copy fails, the segment is
+    re-encoded instead.
     Returns path to created segment or None if failed.
     """
     try:
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, output_filename)
-        duration = end_time - start_time
         
-        cmd = [
-            'ffmpeg', '-y',
-            '-ss', str(start_time),
-            '-i', video_path,
-            '-t', str(duration),
-            '-c:v', 'libx264',
-            '-preset', 'slow',
-            '-c:a', 'aac',
-            '-b:a', '256k',
-            '-loglevel', 'error',
-            output_path
-        ]
+        if copy_mode and not is_copy_compatible(video_path):
+            logger.info("Source codecs can't be stream-copied into mp4, re-encoding")
+        elif copy_mode:
+            keyframes = get_keyframes(video_path)
+            snapped = _snap_to_keyframe(keyframes, start_time)
+            if not keyframes or start_time - snapped > 2:
+                logger.info(f"No keyframe near {start_time:.2f}s, re-encoding {output_path}")
+            elif _copy_segment(video_path, snapped, end_time, output_path):
+                return output_path
+            else:
+                logger.warning(f"Stream copy failed, re-encoding {output_path}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            logger.error(f"FFmpeg error: {result.stderr}")
-            return None
-            
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 1000:
-            return output_path
-        return None
+        return _encode_segment(video_path, start_time, end_time - start_time, output_path,
+                               get_h264_encoder(), _ffmpeg_threads(1), _COMPAT_MOVFLAGS)
         
     except Exception as e:
-        logger.error(f"Error splitting segment: {e}")
+        logger.error(f"Error splitting video: {e}")
         return None
 
 
+def _encode_segment(video_path: str, start_time: float, duration: float, segment_path: str,
+                    encoder: str, threads: int, movflags: str = _FRAGMENTED_MOVFLAGS) -> Optional[str]:
+    """Re-encode one segment. Returns segment path or None if failed."""
+    cmd = [
+        'ffmpeg', '-y',  # Overwrite output
+        *_decode_args(encoder),  # Hardware decode when encoding on hardware
+        '-ss', str(start_time),  # Start time (before -i for fast seek)
+        '-i', video_path,  # Input file
+        '-t', str(duration),  # Duration
+        *_video_codec_args(encoder),  # Video codec
+        '-threads', str(threads),  # Don't oversubscribe CPUs across parallel runs
+        '-c:a', 'aac',  # Audio codec
+        '-b:a', '256k',  # Good audio quality
+        '-movflags', movflags,  # Web optimization
+        '-loglevel', 'error',  # Only show errors
+        segment_path
+    ]
+    
+    returncode, stderr = _run_ffmpeg(cmd, timeout=_ffmpeg_timeout(duration))
+    
+    if returncode != 0:
+        logger.error(f"FFmpeg error for {segment_path}: {stderr}")
+        _remove_partial(segment_path)
+        return None
+    
+    if os.path.exists(segment_path) and os.path.getsize(segment_path) > 1000:
+        return segment_path
+    
+    logger.error(f"Segment creation failed (file missing or too small): {segment_path}")
+    return None
+
 
 class VideoSplitter:
     def __init__(self, output_dir: str = "processed"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
     
-    def split_video(self, video_path: str, video_id: str, segment_duration: int = 60) -> List[str]:
+    @property
+    def encoder(self) -> str:
+        """H.264 encoder for re-encodes, probed on first use (once per process, shared by all splitters)"""
+        return get_h264_encoder()
+    
+    def _segment_paths(self, video_id: str) -> List[str]:
+        """Existing {video_id}_partN.mp4 files in output_dir, in part order"""
+        part_re = re.compile(rf"^{re.escape(video_id)}_part(\d+)\.mp4$")
+        parts = []
+        for filename in os.listdir(self.output_dir):
+            match = part_re.match(filename)
+            if match:
+                parts.append((int(match.group(1)), os.path.join(self.output_dir, filename)))
+        return [path for _, path in sorted(parts)]
+    
+    def _clear_segments(self, video_id: str):
+        """Remove parts left over from an earlier run so they aren't picked up"""
+        for stale_path in self._segment_paths(video_id):
+            os.remove(stale_path)
+    
+    def _copy_segments(self, video_path: str, video_id: str, total_duration: float,
+                       segment_duration: int, movflags: str = _FRAGMENTED_MOVFLAGS) -> List[str]:
+        """Stream-copy the whole video into parts with one FFmpeg run"""
+        self._clear_segments(video_id)
+        output_pattern = os.path.join(self.output_dir, f"{video_id}_part%d.mp4")
+        
+        cmd = [
+            'ffmpeg', '-y',  # Overwrite output
+            '-i', video_path,  # Input file
+            '-c', 'copy',  # Copy packets as-is: no decode/encode, cuts land on keyframes
+            '-f', 'segment',  # One output file per segment
+            '-segment_time', str(segment_duration),
+            '-segment_start_number', '1',  # {video_id}_part1.mp4, ...
+            '-reset_timestamps', '1',  # Each part starts at t=0
+            '-segment_format', 'mp4',
+            '-segment_format_options', f'movflags={movflags}',  # Web optimization
+            '-loglevel', 'error',  # Only show errors
+            output_pattern
+        ]
+        
+        returncode, stderr = _run_ffmpeg(cmd, timeout=_ffmpeg_timeout(total_duration))
+        
+        if returncode != 0:
+            logger.error(f"FFmpeg error (copy): {stderr}")
+            return []
+        
+        written = self._segment_paths(video_id)
+        
+        # Drop the final segment if it's too short (< 10s)
+        if written:
+            try:
+                tail_duration = _probe_duration(written[-1])
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                tail_duration = segment_duration  # Can't tell, keep it
+            if tail_duration < 10:
+                logger.info(f"Skipping final segment (too short: {tail_duration:.2f}s)")
+                os.remove(written.pop())
+        
+        return written
+    
+    def _encode_segments(self, video_path: str, video_id: str, plan: List[Tuple[int, float]],
+                         threads_per_invocation: Optional[int] = None,
+                         movflags: str = _FRAGMENTED_MOVFLAGS) -> List[str]:
+        """Re-encode every part as its own FFmpeg run, several at a time"""
+        self._clear_segments(video_id)
+        
+        jobs = [
+            (video_path, start_time, duration,
+             os.path.join(self.output_dir, f"{video_id}_part{segment_num}.mp4"))
+            for segment_num, (start_time, duration) in enumerate(plan, 1)
+        ]
+        
+        if not jobs:
+            return []
+        
+        cpu_count = os.cpu_count() or 1
+        encoder = self.encoder
+        workers = min(len(jobs), max(1, cpu_count // 2))
+        if encoder != 'libx264':
+            # Consumer GPUs only allow a few concurrent encode sessions
+            workers = min(workers, 2)
+        threads = _ffmpeg_threads(workers, threads_per_invocation)
+        
+        logger.info(f"Encoding {len(jobs)} segments ({workers} parallel, {threads} threads each)")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda job: _encode_segment(*job, encoder, threads, movflags), jobs)
+            return [path for path in results if path]
+    
+    def split_video(self, video_path: str, video_id: str, segment_duration: int = 60,
+                    threads_per_invocation: Optional[int] = None, compat: bool = False) -> List[str]:
         """
         Split video into segments of specified duration using FFmpeg directly.
-        This is more reliable than moviepy's write_videofile.
+        If the source is already H.264 + AAC/MP3, all parts are written by a
+        single FFmpeg run (segment muxer) that copies packets without
+        re-encoding; otherwise, or if that fails, parts are re-encoded in
+        parallel.
+        threads_per_invocation: -threads for each parallel encode (default:
+        $KUTTA_FFMPEG_THREADS, else CPUs split across the parallel runs).
+        compat: write classic +faststart mp4s instead of fragmented ones.
         """
         segment_paths = []
+        movflags = _COMPAT_MOVFLAGS if compat else _FRAGMENTED_MOVFLAGS
         
         try:
             logger.info(f"Loading video: {video_path}")
-            total_duration = get_video_duration(video_path)
+            total_duration = _probe_cache(video_path)['duration']
             
             if total_duration <= 0:
                 logger.error("Could not determine video duration")
                 return []
             
+            plan = _plan_segments(total_duration, segment_duration)
             logger.info(f"Video duration: {total_duration:.2f}s")
             logger.info(f"Creating {segment_duration}s segments...")
             
-            segment_num = 1
-            start_time = 0
+            video_codec, audio_codec = _source_codecs(video_path)
+            if is_copy_compatible(video_path):
+                logger.info(f"Source is {video_codec}/{audio_codec or 'no audio'}: stream-copying parts (no re-encode)")
+                written = self._copy_segments(video_path, video_id, total_duration, segment_duration,
+                                              movflags)
+                if not written:
+                    logger.warning("Stream copy failed, falling back to re-encoding")
+            else:
+                logger.info(f"Source is {video_codec}/{audio_codec or 'no audio'}: re-encoding parts to H.264/AAC")
+                written = []
             
-            while start_time < total_duration:
-                end_time = min(start_time + segment_duration, total_duration)
-                duration = end_time - start_time
-                
-                # Skip if segment is too short (< 10s)
-                if duration < 10:
-                    logger.info(f"Skipping final segment (too short: {duration:.2f}s)")
-                    break
-                
-                # Output path
-                segment_filename = f"{video_id}_part{segment_num}.mp4"
-                segment_path = os.path.join(self.output_dir, segment_filename)
-                
-                # Build FFmpeg command
-                logger.info(f"Writing segment {segment_num}: {start_time:.2f}s - {end_time:.2f}s")
-                
-                cmd = [
-                    'ffmpeg', '-y',  # Overwrite output
-                    '-ss', str(start_time),  # Start time (before -i for fast seek)
-                    '-i', video_path,  # Input file
-                    '-t', str(duration),  # Duration
-                    '-c:v', 'libx264',  # Video codec
-                    '-preset', 'slow',  # Good quality encoding
-                    '-c:a', 'aac',  # Audio codec
-                    '-b:a', '256k',  # Good audio quality
-                    '-movflags', '+faststart',  # Web optimization
-                    '-loglevel', 'error',  # Only show errors
-                    segment_path
-                ]
-                
-                # Run FFmpeg
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    logger.error(f"FFmpeg error for segment {segment_num}: {result.stderr}")
-                    continue
-                
-                # Verify output
-                if os.path.exists(segment_path) and os.path.getsize(segment_path) > 1000:
+            if not written:
+                written = self._encode_segments(video_path, video_id, plan, threads_per_invocation, movflags)
+            
+            # Verify output
+            for segment_num, segment_path in enumerate(written, 1):
+                if os.path.getsize(segment_path) > 1000:
                     segment_paths.append(segment_path)
                     logger.info(f"✓ Segment {segment_num} created successfully")
                 else:
-                    logger.error(f"Segment creation failed (file missing or too small): {segment_path}")
-                
-                start_time = end_time
-                segment_num += 1
+                    logger.error(f"Segment creation failed (file too small): {segment_path}")
             
             logger.info(f"Created {len(segment_paths)} segments")
             return segment_paths
@@ -150,23 +633,22 @@ class VideoSplitter:
             return []
     
     def get_segment_info(self, video_path: str, segment_duration: int = 60) -> dict:
-        """Get information about how the video would be split"""
+        """
+        Get information about how the video would be split.
+        'segments' is the (start_time, duration) plan split_video follows.
+        """
         try:
-            total_duration = get_video_duration(video_path)
+            total_duration = _probe_cache(video_path)['duration']
             
             if total_duration <= 0:
                 return {}
             
-            num_segments = int(total_duration / segment_duration)
-            # Add one more if there's a remainder >= 10 seconds
-            remainder = total_duration % segment_duration
-            if remainder >= 10:
-                num_segments += 1
-            
+            plan = _plan_segments(total_duration, segment_duration)
             return {
                 'total_duration': total_duration,
-                'num_segments': num_segments,
-                'segment_duration': segment_duration
+                'num_segments': len(plan),
+                'segment_duration': segment_duration,
+                'segments': plan
             }
         except Exception as e:
             logger.error(f"Error getting video info: {e}")
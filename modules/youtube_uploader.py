@@ -3,13 +3,13 @@ YouTube Shorts Uploader
 Automatic video upload to YouTube using official API
 """
 import os
-import pickle
+import json
+import random
+import threading
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,12 +17,33 @@ logger = logging.getLogger(__name__)
 # YouTube API scopes
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
+# Saved OAuth token (JSON). Older versions pickled it; migrated on first load.
+TOKEN_FILE = 'youtube_token.json'
+LEGACY_TOKEN_FILE = 'youtube_token.pickle'
+
+# Resumable upload tuning
+SINGLE_REQUEST_MAX_BYTES = 100 * 1024 * 1024  # Smaller files go up in one request
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB chunks for bigger files
+RETRIABLE_STATUS_CODES = (500, 502, 503, 504)
+MAX_RETRIES = 5
+
+# Markers YouTube uses to pick up Shorts (compared lowercase)
+_SHORTS_TAG = 'shorts'
+_SHORTS_HASHTAG = '#shorts'
+
+
+def _running_in_ci() -> bool:
+    """True on CI runners (GitHub Actions etc.), where there's no browser or local user"""
+    return bool(os.environ.get('CI') or os.environ.get('GITHUB_ACTIONS'))
+
 
 class YouTubeUploader:
     def __init__(self, credentials_file='youtube_credentials.json'):
         self.credentials_file = credentials_file
-        self.token_file = 'youtube_token.pickle'
+        self.token_file = TOKEN_FILE
         self.youtube = None
+        self._creds = None
+        self._local = threading.local()
         self._authenticate()
     
     def _authenticate(self):
@@ -31,31 +52,42 @@ class YouTubeUploader:
         First time: Browser open hoga for permission
         Next time: Saved token use karega
         """
+        # Google client libraries are heavy; only import them when authenticating
+        from googleapiclient.discovery import build
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        
         creds = None
         
         # Load saved token if exists
         if os.path.exists(self.token_file):
             logger.info("Loading saved YouTube credentials from file...")
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
+            with open(self.token_file, 'r', encoding='utf-8') as token:
+                creds = Credentials.from_authorized_user_info(json.load(token), SCOPES)
         elif os.environ.get('YOUTUBE_TOKEN_BASE64'):
             logger.info("Loading YouTube credentials from environment secret...")
             import base64
             try:
-                token_data = base64.b64decode(os.environ['YOUTUBE_TOKEN_BASE64'])
-                creds = pickle.loads(token_data)
+                token_data = base64.b64decode(os.environ['YOUTUBE_TOKEN_BASE64']).decode('utf-8')
+                creds = Credentials.from_authorized_user_info(json.loads(token_data), SCOPES)
                 # optionally save to file for local reuse
-                with open(self.token_file, 'wb') as token:
-                     pickle.dump(creds, token)
+                self._save_token(creds)
             except Exception as e:
                 logger.error(f"Failed to decode env token: {e}")
-
+        elif os.path.exists(LEGACY_TOKEN_FILE):
+            creds = self._migrate_legacy_token()
         
         # If no valid credentials, authenticate
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 logger.info("Refreshing YouTube credentials...")
                 creds.refresh(Request())
+            elif _running_in_ci():
+                # No browser on a headless runner: run_local_server would hang forever
+                raise RuntimeError(
+                    "No valid YouTube token in CI; set the YOUTUBE_TOKEN secret from youtube_token.json"
+                )
             else:
                 logger.info("First time authentication - browser will open...")
                 if not os.path.exists(self.credentials_file):
@@ -69,14 +101,53 @@ class YouTubeUploader:
                 creds = flow.run_local_server(port=0)
             
             # Save credentials for next time
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
+            self._save_token(creds)
             logger.info("✓ Credentials saved")
         
         # Build YouTube service
+        self._creds = creds
         self.youtube = build('youtube', 'v3', credentials=creds)
         logger.info("✓ YouTube API authenticated successfully")
     
+    def _save_token(self, creds):
+        """Write credentials to the JSON token file"""
+        with open(self.token_file, 'w', encoding='utf-8') as token:
+            token.write(creds.to_json())
+    
+    def _migrate_legacy_token(self):
+        """
+        One-time migration of a pickled token from older versions to JSON.
+        Only for a token the user created locally: never in CI, where the
+        file could only have come from a secret.
+        """
+        if _running_in_ci():
+            logger.error(f"Refusing to load {LEGACY_TOKEN_FILE} in CI; store youtube_token.json (base64) as the secret instead")
+            return None
+        
+        import pickle
+        
+        logger.info(f"Migrating {LEGACY_TOKEN_FILE} to {self.token_file}...")
+        try:
+            with open(LEGACY_TOKEN_FILE, 'rb') as token:
+                creds = pickle.load(token)
+            self._save_token(creds)
+            logger.info(f"✓ Token migrated (you can delete {LEGACY_TOKEN_FILE})")
+            return creds
+        except Exception as e:
+            logger.error(f"Failed to migrate legacy token: {e}")
+            return None
+    
+    def _service(self):
+        """YouTube API client for the current thread (clients aren't thread-safe)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.youtube
+        youtube = getattr(self._local, 'youtube', None)
+        if youtube is None:
+            from googleapiclient.discovery import build
+            youtube = build('youtube', 'v3', credentials=self._creds)
+            self._local.youtube = youtube
+        return youtube
+    
     def is_daily_limit_reached(self) -> bool:
         """
         Check if daily upload limit has been reached.
@@ -117,14 +188,17 @@ class YouTubeUploader:
             logger.error(f"Video file not found: {video_path}")
             return None
         
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import MediaFileUpload
+        
         # Add #Shorts to description for YouTube Shorts
-        if '#Shorts' not in description and '#shorts' not in description:
+        if _SHORTS_HASHTAG not in description.lower():
             description = description + '\n\n#Shorts'
         
         if tags is None:
-            tags = ['shorts']
-        elif 'shorts' not in [t.lower() for t in tags]:
-            tags.append('shorts')
+            tags = [_SHORTS_TAG]
+        elif _SHORTS_TAG not in {t.lower() for t in tags}:
+            tags = tags + [_SHORTS_TAG]
         
         # Video metadata
         body = {
@@ -140,12 +214,16 @@ class YouTubeUploader:
             }
         }
         
-        # Media file
+        # Media file (-1 = whole file in a single request)
+        if os.path.getsize(video_path) <= SINGLE_REQUEST_MAX_BYTES:
+            chunksize = -1
+        else:
+            chunksize = UPLOAD_CHUNK_SIZE
         media = MediaFileUpload(
             video_path,
             mimetype='video/*',
             resumable=True,
-            chunksize=1024*1024  # 1MB chunks
+            chunksize=chunksize
         )
         
         try:
@@ -153,15 +231,26 @@ class YouTubeUploader:
             logger.info(f"File: {video_path}")
             
             # Execute upload
-            request = self.youtube.videos().insert(
+            request = self._service().videos().insert(
                 part=','.join(body.keys()),
                 body=body,
                 media_body=media
             )
             
             response = None
+            retry = 0
             while response is None:
-                status, response = request.next_chunk()
+                try:
+                    status, response = request.next_chunk()
+                except HttpError as e:
+                    # Server-side hiccups are worth retrying; quota/auth errors are not
+                    if e.resp.status not in RETRIABLE_STATUS_CODES or retry >= MAX_RETRIES:
+                        raise
+                    retry += 1
+                    wait = 2 ** retry + random.random()
+                    logger.warning(f"Upload error {e.resp.status}, retrying in {wait:.1f}s ({retry}/{MAX_RETRIES})")
+                    time.sleep(wait)
+                    continue
                 if status:
                     progress = int(status.progress() * 100)
                     logger.info(f"Upload progress: {progress}%")
@@ -185,7 +274,8 @@ class YouTubeUploader:
         title_template: str = '{title} - Part {part}',
         description_template: str = '{title}\n\n#Shorts #Viral',
         tags: list = None,
-        delay_seconds: int = 0
+        delay_seconds: int = 0,
+        max_workers: int = 3
     ) -> dict:
         """
         Upload multiple videos
@@ -195,31 +285,51 @@ class YouTubeUploader:
             title_template: Template for title
             description_template: Template for description
             tags: Common tags for all videos
-            delay_seconds: Delay between uploads
+            delay_seconds: Delay between uploads (uploads run one at a time if set)
+            max_workers: Number of uploads to run in parallel
         
         Returns:
             Dictionary with upload results
         """
-        import time
-        
         results = {
             'successful': [],
             'failed': []
         }
         
-        for i, (video_path, part_num, video_title) in enumerate(videos):
-            # Generate title and description
-            title = title_template.format(title=video_title, part=part_num)
-            description = description_template.format(title=video_title, part=part_num)
-            
-            # Upload
-            video_id = self.upload_short(
+        # Generate titles and descriptions up front so workers only upload
+        jobs = [
+            (
+                video_path,
+                title_template.format(title=video_title, part=part_num),
+                description_template.format(title=video_title, part=part_num)
+            )
+            for video_path, part_num, video_title in videos
+        ]
+        
+        def upload_one(job):
+            video_path, title, description = job
+            return self.upload_short(
                 video_path=video_path,
                 title=title,
                 description=description,
                 tags=tags
             )
-            
+        
+        if delay_seconds > 0 or max_workers <= 1:
+            video_ids = []
+            for i, job in enumerate(jobs):
+                video_ids.append(upload_one(job))
+                
+                # Delay before next upload
+                if delay_seconds > 0 and i < len(jobs) - 1:
+                    logger.info(f"Waiting {delay_seconds}s before next upload...")
+                    time.sleep(delay_seconds)
+        else:
+            # Uploads are network-bound and independent, so overlap them
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                video_ids = list(executor.map(upload_one, jobs))
+        
+        for (video_path, _, _), video_id in zip(jobs, video_ids):
             if video_id:
                 results['successful'].append({
                     'video_path': video_path,
@@ -228,11 +338,6 @@ class YouTubeUploader:
                 })
             else:
                 results['failed'].append(video_path)
-            
-            # Delay before next upload
-            if delay_seconds > 0 and i < len(videos) - 1:
-                logger.info(f"Waiting {delay_seconds}s before next upload...")
-                time.sleep(delay_seconds)
         
         logger.info(f"\n=== Upload Summary ===")
         logger.info(f"Successful: {len(results['successful'])}")
@@ -3,6 +3,46 @@ Quick Start Guide - YouTube Shorts Automation
 """
 import json
 import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Static "what to do next" help printed once everything checks out
+_NEXT_STEPS = """
+🚀 Ready to Start! Choose an option:
+
+Option 1: Full Automation (Recommended)
+  python main.py --full
+  → Downloads, processes, and uploads highest viewed video
+
+Option 2: Step by Step
+  python main.py --scrape     # Update video list
+  python main.py --status     # Check current status
+  python main.py --full       # Run full automation
+
+Option 3: Check Status First
+  python main.py --status     # See what's already been done
+
+================================================================================
+📈 YouTube API Quota:
+  Default: ~6 uploads/day
+  Request increase for 60+ uploads/day (free, 24-48hr)
+  See YOUTUBE_SETUP.md for quota increase guide
+================================================================================
+
+💡 Tips:
+  - First run will take time (downloading + processing)
+  - Videos are saved locally (won't re-download)
+  - Check logs/automation.log for detailed progress
+  - Already uploaded videos are automatically skipped
+
+✅ Safe & Legal:
+  - Uses official YouTube API
+  - No ban risk
+  - Monetization eligible
+
+================================================================================
+"""
 
 print("=" * 80)
 print("YouTube to YouTube Shorts Automation - Quick Start")
@@ -44,7 +84,7 @@ if not os.path.exists(credentials_file):
 print(f"✓ Credentials file found: {credentials_file}")
 
 # Check if already authenticated
-if os.path.exists('youtube_token.pickle'):
+if os.path.exists('youtube_token.json') or os.path.exists('youtube_token.pickle'):
     print("✓ Already authenticated (token found)")
 else:
     print("⚠️  First time authentication needed")
@@ -52,41 +92,85 @@ else:
     print("Browser will open → Login → Grant permissions → Done!")
     exit(1)
 
-# Step 3: Test YouTube API
-print("\n🎬 Step 3: Testing YouTube API...")
-try:
-    from modules.youtube_uploader import YouTubeUploader
-    
-    uploader = YouTubeUploader(credentials_file)
-    print("✓ YouTube API authenticated successfully!")
-    
-except Exception as e:
-    print(f"✗ YouTube API authentication failed: {e}")
-    print("\nTry:")
-    print("1. Delete youtube_token.pickle")
-    print("2. Run: python modules\\youtube_uploader.py")
-    exit(1)
-
-# Step 4: Test scraper
-print("\n🔍 Step 4: Testing YouTube Scraper...")
-try:
-    from modules.scraper import get_channel_videos
-    
-    videos = get_channel_videos(youtube_channel)
-    
-    if videos:
-        print(f"✓ Found {len(videos)} videos!")
-        print(f"\nHighest viewed video:")
-        top = videos[0]
-        print(f"  Title: {top['title']}")
-        print(f"  Views: {top['views']:,}")
-        print(f"  Duration: {top['duration']}")
-    else:
-        print("✗ No videos found. Check the channel URL.")
-        exit(1)
+# Steps 3, 4 and 6 are independent (and mostly waiting on the network or a
+# subprocess), so run them at the same time. Each returns (ok, lines, result).
+def check_youtube_api():
+    """Step 3: Test YouTube API"""
+    lines = ["\n🎬 Step 3: Testing YouTube API..."]
+    try:
+        from modules.youtube_uploader import YouTubeUploader
+        
+        YouTubeUploader(credentials_file)
+        lines.append("✓ YouTube API authenticated successfully!")
+        return True, lines, None
         
-except Exception as e:
-    print(f"✗ Scraper test failed: {e}")
+    except Exception as e:
+        lines.append(f"✗ YouTube API authentication failed: {e}")
+        lines.append("\nTry:")
+        lines.append("1. Delete youtube_token.json")
+        lines.append("2. Run: python modules\\youtube_uploader.py")
+        return False, lines, None
+
+
+def check_scraper():
+    """Step 4: Test scraper"""
+    lines = ["\n🔍 Step 4: Testing YouTube Scraper..."]
+    try:
+        from modules.scraper import get_channel_videos
+        
+        videos = get_channel_videos(youtube_channel)
+        
+        if videos:
+            lines.append(f"✓ Found {len(videos)} videos!")
+            lines.append(f"\nHighest viewed video:")
+            top = videos[0]
+            lines.append(f"  Title: {top['title']}")
+            lines.append(f"  Views: {top['views']:,}")
+            lines.append(f"  Duration: {top['duration']}")
+            return True, lines, videos
+        else:
+            lines.append("✗ No videos found. Check the channel URL.")
+            return False, lines, None
+            
+    except Exception as e:
+        lines.append(f"✗ Scraper test failed: {e}")
+        return False, lines, None
+
+
+def check_ffmpeg():
+    """Step 6: Check FFmpeg"""
+    lines = ["\n🎥 Step 6: Checking FFmpeg..."]
+    try:
+        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
+        if result.returncode == 0:
+            lines.append("✓ FFmpeg installed")
+        else:
+            lines.append("✗ FFmpeg not working properly")
+        return True, lines, None
+    except FileNotFoundError:
+        lines.append("✗ FFmpeg not found in PATH")
+        lines.append("\nPlease install FFmpeg:")
+        lines.append("https://ffmpeg.org/download.html")
+        return False, lines, None
+
+
+all_ok = True
+videos = []
+with ThreadPoolExecutor(max_workers=3) as executor:
+    futures = {
+        executor.submit(check_youtube_api): 'youtube',
+        executor.submit(check_scraper): 'scraper',
+        executor.submit(check_ffmpeg): 'ffmpeg',
+    }
+    # Print each step's output as soon as it finishes
+    for future in as_completed(futures):
+        ok, lines, result = future.result()
+        print("\n".join(lines))
+        all_ok = all_ok and ok
+        if futures[future] == 'scraper' and ok:
+            videos = result
+
+if not all_ok:
     exit(1)
 
 # Step 5: Check directories
@@ -98,21 +182,6 @@ for dirname in ['downloads', 'processed', 'logs']:
         os.makedirs(dirname)
         print(f"✓ Created {dirname}/")
 
-# Step 6: Check FFmpeg
-print("\n🎥 Step 6: Checking FFmpeg...")
-import subprocess
-try:
-    result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
-    if result.returncode == 0:
-        print("✓ FFmpeg installed")
-    else:
-        print("✗ FFmpeg not working properly")
-except FileNotFoundError:
-    print("✗ FFmpeg not found in PATH")
-    print("\nPlease install FFmpeg:")
-    print("https://ffmpeg.org/download.html")
-    exit(1)
-
 # All checks passed!
 print("\n" + "=" * 80)
 print("✅ SETUP COMPLETE! ALL SYSTEMS READY!")
@@ -122,35 +191,4 @@ print(f"\n🎯 Target Channel: {youtube_channel}")
 print(f"📊 Available Videos: {len(videos)}")
 print(f"🏆 Top Video: {videos[0]['views']:,} views")
 
-print("\n🚀 Ready to Start! Choose an option:\n")
-print("Option 1: Full Automation (Recommended)")
-print("  python main.py --full")
-print("  → Downloads, processes, and uploads highest viewed video\n")
-
-print("Option 2: Step by Step")
-print("  python main.py --scrape     # Update video list")
-print("  python main.py --status     # Check current status")
-print("  python main.py --full       # Run full automation\n")
-
-print("Option 3: Check Status First")
-print("  python main.py --status     # See what's already been done\n")
-
-print("=" * 80)
-print("📈 YouTube API Quota:")
-print("  Default: ~6 uploads/day")
-print("  Request increase for 60+ uploads/day (free, 24-48hr)")
-print("  See YOUTUBE_SETUP.md for quota increase guide")
-print("=" * 80)
-
-print("\n💡 Tips:")
-print("  - First run will take time (downloading + processing)")
-print("  - Videos are saved locally (won't re-download)")
-print("  - Check logs/automation.log for detailed progress")
-print("  - Already uploaded videos are automatically skipped")
-
-print("\n✅ Safe & Legal:")
-print("  - Uses official YouTube API")
-print("  - No ban risk")
-print("  - Monetization eligible")
-
-print("\n" + "=" * 80)
+sys.stdout.write(_NEXT_STEPS)
@@ -2,54 +2,136 @@
 Advanced Tracking Manager
 View and manage uploaded videos
 """
+import heapq
 import json
+import mmap
+import os
+import sys
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson  # Optional: much faster loads/dumps for large tracking files
+except ImportError:
+    orjson = None
+
+# Tracking files bigger than this are parsed straight from a memory map
+_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def _read_json(path: str):
+    """Parse a JSON file from raw bytes (orjson if available, else stdlib json)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= _MMAP_THRESHOLD:
+            raw = f.read()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if orjson is not None:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            return json.loads(mm[:])
 
 
 class TrackingManager:
     def __init__(self, tracking_file='tracking.json'):
         self.tracking_file = tracking_file
         self.tracking = self._load()
+        self._videos = self.tracking['videos']  # Shortcut for the per-video lookups below
+        self._dirty = False
+        self._batch_depth = 0
     
     def _load(self) -> dict:
         try:
-            with open(self.tracking_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            tracking = _read_json(self.tracking_file)
         except FileNotFoundError:
-            return {'channel_url': '', 'last_scrape': None, 'videos': {}}
+            tracking = {'channel_url': '', 'last_scrape': None, 'videos': {}}
+        videos = tracking.setdefault('videos', {})
+        
+        # Video IDs per status, so lookups don't scan every video. Dict keys
+        # (not sets) keep tracking.json order, so listings are stable. The few
+        # distinct status strings are interned so records share one object each.
+        self._by_status: Dict[str, Dict[str, None]] = defaultdict(dict)
+        for vid, data in videos.items():
+            if 'status' in data:
+                data['status'] = sys.intern(data['status'])
+            self._by_status[data.get('status', 'pending')][vid] = None
+        
+        # (last_upload, video ID) of completed videos, oldest first
+        self._completed_by_date: List[Tuple[str, str]] = sorted(
+            (videos[vid].get('last_upload') or '', vid) for vid in self._by_status['completed']
+        )
+        
+        return tracking
+    
+    def _set_status(self, video_id: str, status: str):
+        """Update a video's status and keep the status indexes in sync"""
+        video = self._videos[video_id]
+        old_status = video.get('status', 'pending')
+        self._by_status[old_status].pop(video_id, None)
+        if old_status == 'completed':
+            entry = (video.get('last_upload') or '', video_id)
+            i = bisect_left(self._completed_by_date, entry)
+            if i < len(self._completed_by_date) and self._completed_by_date[i] == entry:
+                del self._completed_by_date[i]
+        video['status'] = status
+        self._by_status[status][video_id] = None
+    
+    @contextmanager
+    def batch(self):
+        """
+        Defer saving until the block ends, so several updates cost one write:
+            with manager.batch():
+                now_iso = datetime.now().isoformat()
+                for video_id in video_ids:
+                    manager.mark_as_uploaded(video_id, parts, now_iso)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._save()
     
     def _save(self):
-        with open(self.tracking_file, 'w', encoding='utf-8') as f:
-            json.dump(self.tracking, f, indent=2, ensure_ascii=False)
+        if self._batch_depth > 0:
+            self._dirty = True
+            return
+        self._dirty = False
+        
+        if orjson is not None:
+            data = orjson.dumps(self.tracking, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(self.tracking, indent=2, ensure_ascii=False).encode('utf-8')
+        
+        # Write a temp file and swap it in, so a crash mid-write can't corrupt tracking.json
+        tmp_path = self.tracking_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.tracking_file)
     
     def get_stats(self) -> dict:
         """Get overall statistics"""
-        videos = self.tracking.get('videos', {})
-        
         stats = {
-            'total': len(videos),
+            'total': len(self._videos),
             'pending': 0,
             'downloaded': 0,
             'processed': 0,
             'completed': 0,
             'partial': 0
         }
-        
-        for video_data in videos.values():
-            status = video_data.get('status', 'pending')
-            stats[status] = stats.get(status, 0) + 1
+        stats.update({status: len(ids) for status, ids in self._by_status.items()})
         
         return stats
     
     def get_pending_videos(self) -> List[tuple]:
         """Get all pending videos sorted by views"""
-        videos = self.tracking.get('videos', {})
-        
-        pending = [
-            (vid, data) for vid, data in videos.items()
-            if data.get('status') == 'pending'
-        ]
+        pending = [(vid, self._videos[vid]) for vid in self._by_status['pending']]
         
         # Sort by views (highest first)
         pending.sort(key=lambda x: x[1].get('views', 0), reverse=True)
@@ -58,98 +140,122 @@ class TrackingManager:
     
     def get_completed_videos(self) -> List[tuple]:
         """Get all completed videos"""
-        videos = self.tracking.get('videos', {})
-        
-        completed = [
-            (vid, data) for vid, data in videos.items()
-            if data.get('status') == 'completed'
-        ]
+        completed = [(vid, self._videos[vid]) for vid in self._by_status['completed']]
         
         return completed
     
+    def get_top_pending(self, k: Optional[int] = None) -> Tuple[int, List[tuple]]:
+        """
+        Get (number of pending videos, pending videos by views, highest first).
+        With k, only the top k are selected (bounded heap, no full sort).
+        """
+        total = len(self._by_status['pending'])
+        if k is None:
+            return total, self.get_pending_videos()
+        return total, heapq.nlargest(
+            k, ((vid, self._videos[vid]) for vid in self._by_status['pending']),
+            key=lambda x: x[1].get('views', 0)
+        )
+    
+    def get_recent_completed(self, k: int) -> List[tuple]:
+        """Get the k most recently uploaded completed videos (newest first)"""
+        recent = self._completed_by_date[-k:] if k > 0 else []
+        return [(vid, self._videos[vid]) for _, vid in reversed(recent)]
+    
     def is_already_uploaded(self, video_id: str) -> bool:
         """Check if video is already uploaded"""
-        video = self.tracking.get('videos', {}).get(video_id, {})
-        return video.get('status') == 'completed'
+        return video_id in self._by_status['completed']
     
-    def mark_as_uploaded(self, video_id: str, parts: List[int]):
-        """Mark video as uploaded"""
-        if video_id in self.tracking.get('videos', {}):
-            self.tracking['videos'][video_id]['status'] = 'completed'
-            self.tracking['videos'][video_id]['parts_uploaded'] = parts
-            self.tracking['videos'][video_id]['last_upload'] = datetime.now().isoformat()
+    def mark_as_uploaded(self, video_id: str, parts: List[int], now_iso: Optional[str] = None):
+        """
+        Mark video as uploaded.
+        now_iso: upload timestamp; batch callers can compute it once and pass
+        it for every video (defaults to the current time).
+        """
+        if video_id in self._videos:
+            self._set_status(video_id, 'completed')
+            video = self._videos[video_id]
+            video['parts_uploaded'] = parts
+            video['last_upload'] = now_iso or datetime.now().isoformat()
+            insort(self._completed_by_date, (video['last_upload'], video_id))
             self._save()
     
     def reset_video_status(self, video_id: str):
         """Reset video to pending (to re-upload)"""
-        if video_id in self.tracking.get('videos', {}):
-            self.tracking['videos'][video_id]['status'] = 'pending'
-            self.tracking['videos'][video_id]['parts_uploaded'] = []
+        if video_id in self._videos:
+            self._set_status(video_id, 'pending')
+            self._videos[video_id]['parts_uploaded'] = []
             self._save()
     
     def export_uploaded_list(self, filename='uploaded_videos.txt'):
         """Export list of uploaded videos to text file"""
         completed = self.get_completed_videos()
         
+        # Build the whole file in memory and write it in one go
+        lines = [
+            "=" * 80 + "\n",
+            "UPLOADED VIDEOS LIST\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            "=" * 80 + "\n\n",
+        ]
+        for i, (vid, data) in enumerate(completed, 1):
+            lines.append(
+                f"{i}. {data['title']}\n"
+                f"   Video ID: {vid}\n"
+                f"   Views: {data.get('views', 0):,}\n"
+                f"   Parts Uploaded: {data.get('parts_uploaded', [])}\n"
+                f"   Upload Date: {data.get('last_upload', 'N/A')}\n"
+                f"   URL: {data.get('url', 'N/A')}\n"
+                "\n"
+            )
+        
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("UPLOADED VIDEOS LIST\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 80 + "\n\n")
-            
-            for i, (vid, data) in enumerate(completed, 1):
-                f.write(f"{i}. {data['title']}\n")
-                f.write(f"   Video ID: {vid}\n")
-                f.write(f"   Views: {data.get('views', 0):,}\n")
-                f.write(f"   Parts Uploaded: {data.get('parts_uploaded', [])}\n")
-                f.write(f"   Upload Date: {data.get('last_upload', 'N/A')}\n")
-                f.write(f"   URL: {data.get('url', 'N/A')}\n")
-                f.write("\n")
+            f.write("".join(lines))
         
         print(f"✓ Exported {len(completed)} uploaded videos to {filename}")
     
     def show_report(self):
         """Display detailed tracking report"""
-        print("\n" + "=" * 80)
-        print("TRACKING REPORT")
-        print("=" * 80)
-        
-        print(f"\nChannel: {self.tracking.get('channel_url', 'Not set')}")
-        print(f"Last Scrape: {self.tracking.get('last_scrape', 'Never')}")
+        # Collect the report and write it in one go
+        lines = [
+            "\n" + "=" * 80,
+            "TRACKING REPORT",
+            "=" * 80,
+            f"\nChannel: {self.tracking.get('channel_url', 'Not set')}",
+            f"Last Scrape: {self.tracking.get('last_scrape', 'Never')}",
+        ]
         
         stats = self.get_stats()
-        print(f"\n📊 Statistics:")
-        print(f"  Total Videos: {stats['total']}")
-        print(f"  Pending: {stats['pending']}")
-        print(f"  Downloaded: {stats['downloaded']}")
-        print(f"  Processed: {stats['processed']}")
-        print(f"  Completed: {stats['completed']}")
-        print(f"  Partial: {stats.get('partial', 0)}")
+        lines += [
+            "\n📊 Statistics:",
+            f"  Total Videos: {stats['total']}",
+            f"  Pending: {stats['pending']}",
+            f"  Downloaded: {stats['downloaded']}",
+            f"  Processed: {stats['processed']}",
+            f"  Completed: {stats['completed']}",
+            f"  Partial: {stats.get('partial', 0)}",
+        ]
         
         # Show pending videos
-        pending = self.get_pending_videos()
+        _, pending = self.get_top_pending(5)
         if pending:
-            print(f"\n📝 Top 5 Pending Videos (Highest Views):")
-            for i, (vid, data) in enumerate(pending[:5], 1):
-                print(f"  {i}. {data['title']}")
-                print(f"     Views: {data.get('views', 0):,} | ID: {vid}")
+            lines.append("\n📝 Top 5 Pending Videos (Highest Views):")
+            for i, (vid, data) in enumerate(pending, 1):
+                lines.append(f"  {i}. {data['title']}")
+                lines.append(f"     Views: {data.get('views', 0):,} | ID: {vid}")
         
         # Show recently uploaded
-        completed = self.get_completed_videos()
+        completed = self.get_recent_completed(5)
         if completed:
-            # Sort by upload date
-            completed.sort(key=lambda x: x[1].get('last_upload', ''), reverse=True)
-            print(f"\n✅ Recently Uploaded (Last 5):")
-            for i, (vid, data) in enumerate(completed[:5], 1):
-                print(f"  {i}. {data['title']}")
-                print(f"     Parts: {data.get('parts_uploaded', [])} | Uploaded: {data.get('last_upload', 'N/A')}")
-        
-        print("\n" + "=" * 80)
-
+            lines.append("\n✅ Recently Uploaded (Last 5):")
+            for i, (vid, data) in enumerate(completed, 1):
+                lines.append(f"  {i}. {data['title']}")
+                lines.append(f"     Parts: {data.get('parts_uploaded', [])} | Uploaded: {data.get('last_upload', 'N/A')}")
+        
+        lines.append("\n" + "=" * 80)
+        sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
-    import sys
-    
     manager = TrackingManager()
     
     # Parse command
@@ -161,9 +267,9 @@ if __name__ == "__main__":
             print(json.dumps(stats, indent=2))
         
         elif command == 'pending':
-            pending = manager.get_pending_videos()
-            print(f"Found {len(pending)} pending videos")
-            for vid, data in pending[:10]:
+            total, pending = manager.get_top_pending(10)
+            print(f"Found {total} pending videos")
+            for vid, data in pending:
                 print(f"- {data['title']} ({data.get('views', 0):,} views)")
         
         elif command == 'completed':